@@ -1,18 +1,23 @@
 import logging
+import voluptuous as vol
 
 from homeassistant.config_entries import ConfigEntry
-from homeassistant.core import HomeAssistant
+from homeassistant.core import HomeAssistant, ServiceCall, SupportsResponse
 
+from .const import DOMAIN
+from .diagnostics import DEFAULT_SAMPLES, MAX_SAMPLES, async_run_self_test
 from .hub import X728Hub 
 
 _LOGGER = logging.getLogger(__name__)
 
-# NEUE DOMAIN
-DOMAIN = "geekworm_ups_x728"
 PLATFORMS = ["sensor", "binary_sensor", "switch"]
 
+SERVICE_RUN_SELF_TEST = "run_self_test"
+ATTR_SAMPLES = "samples"
+
 async def async_setup(hass: HomeAssistant, config: dict):
-    """Wir verwenden kein YAML-basiertes Setup."""
+    """Wir verwenden kein YAML-basiertes Setup, registrieren aber den Self-Test-Service."""
+    _register_services(hass)
     return True
 
 async def async_setup_entry(hass: HomeAssistant, entry: ConfigEntry) -> bool:
@@ -37,6 +42,30 @@ async def async_setup_entry(hass: HomeAssistant, entry: ConfigEntry) -> bool:
     await hass.config_entries.async_forward_entry_setups(entry, PLATFORMS)
     return True
 
+def _register_services(hass: HomeAssistant):
+    """Registriert den Self-Test-Service (liefert die Diagnosedaten als Antwort)."""
+    async def handle_run_self_test(call: ServiceCall):
+        samples = call.data[ATTR_SAMPLES]
+        results = {}
+        # Kopie der Keys, da Entries während eines laufenden Bursts entladen werden können
+        for entry_id in list(hass.data.get(DOMAIN, {})):
+            entry = hass.config_entries.async_get_entry(entry_id)
+            if entry is None or entry_id not in hass.data.get(DOMAIN, {}):
+                continue
+            results[entry_id] = await async_run_self_test(hass, entry, samples)
+        return results
+
+    hass.services.async_register(
+        DOMAIN,
+        SERVICE_RUN_SELF_TEST,
+        handle_run_self_test,
+        schema=vol.Schema({
+            vol.Optional(ATTR_SAMPLES, default=DEFAULT_SAMPLES):
+                vol.All(vol.Coerce(int), vol.Range(min=1, max=MAX_SAMPLES))
+        }),
+        supports_response=SupportsResponse.ONLY,
+    )
+
 async def async_unload_entry(hass: HomeAssistant, entry: ConfigEntry) -> bool:
     """Wird beim Entfernen der Integration aufgerufen."""
     _LOGGER.info("Unloading Geekworm X728 UPS (entry_id=%s)", entry.entry_id)
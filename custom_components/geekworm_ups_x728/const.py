@@ -0,0 +1,2 @@
+# NEUE DOMAIN
+DOMAIN = "geekworm_ups_x728"
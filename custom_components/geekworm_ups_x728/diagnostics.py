@@ -0,0 +1,176 @@
+import logging
+import statistics
+import time
+
+import gpiod
+import smbus2
+
+from homeassistant.config_entries import ConfigEntry
+from homeassistant.core import HomeAssistant
+from homeassistant.helpers import entity_registry as er
+
+from .const import DOMAIN
+from .binary_sensor import PIN_POWER_LOSS
+from .sensor import DEVICE_ADDRESS
+from .switch import PIN_CHARGING, PIN_CONTROL
+
+_LOGGER = logging.getLogger(__name__)
+
+# I2C-Bus und Register (VCELL), die auch von den Sensoren gelesen werden
+I2C_BUS = 1
+VCELL_REGISTER = 0x02
+
+# Anzahl der Registerzugriffe pro Self-Test (Standard / Obergrenze für den Service)
+DEFAULT_SAMPLES = 50
+MAX_SAMPLES = 1000
+
+PINS = {
+    "power_loss": PIN_POWER_LOSS,
+    "charging": PIN_CHARGING,
+    "shutdown": PIN_CONTROL,
+}
+
+
+def _gpio_self_test(chip_path: str) -> dict:
+    """
+    Öffnet den GPIO-Chip erneut (unabhängig von der Hub-Instanz) und misst die
+    Öffnungsdauer. Liefert so den aktuellen Zustand statt des Werts vom Start.
+    """
+    error = None
+    start = time.perf_counter()
+    try:
+        chip = gpiod.Chip(chip_path)
+    except Exception as e:
+        error = str(e)
+    else:
+        chip.close()
+    return {
+        "chip_open_ms": round((time.perf_counter() - start) * 1000, 3),
+        "chip_error": error,
+    }
+
+
+def _i2c_self_test(samples: int) -> dict:
+    """
+    Öffnet den I2C-Bus und liest das VCELL-Register mehrfach hintereinander.
+    Liefert Öffnungsdauer, Fehlerquote und Latenz/Jitter der Lesezugriffe (in ms).
+    Alle Schlüssel sind immer vorhanden (None, wenn der Burst nicht lief).
+    """
+    result = {
+        "bus": I2C_BUS,
+        "address": hex(DEVICE_ADDRESS),
+        "register": hex(VCELL_REGISTER),
+        "samples": samples,
+        "bus_open_ms": None,
+        "bus_error": None,
+        "burst_ms": None,
+        "errors": None,
+        "error_rate": None,
+        "last_error": None,
+        "read_ms": None,
+    }
+
+    start = time.perf_counter()
+    try:
+        bus = smbus2.SMBus(I2C_BUS)
+    except Exception as e:
+        result["bus_open_ms"] = round((time.perf_counter() - start) * 1000, 3)
+        result["bus_error"] = str(e)
+        return result
+    result["bus_open_ms"] = round((time.perf_counter() - start) * 1000, 3)
+
+    durations = []
+    errors = 0
+    last_error = None
+    burst_start = time.perf_counter()
+    try:
+        for _ in range(samples):
+            t0 = time.perf_counter()
+            try:
+                bus.read_word_data(DEVICE_ADDRESS, VCELL_REGISTER)
+            except Exception as e:
+                errors += 1
+                last_error = str(e)
+                continue
+            durations.append((time.perf_counter() - t0) * 1000)
+    finally:
+        bus.close()
+
+    result["burst_ms"] = round((time.perf_counter() - burst_start) * 1000, 3)
+    result["errors"] = errors
+    result["error_rate"] = round(errors / samples, 4)
+    result["last_error"] = last_error
+    if durations:
+        result["read_ms"] = {
+            "min": round(min(durations), 3),
+            "max": round(max(durations), 3),
+            "mean": round(statistics.fmean(durations), 3),
+            "median": round(statistics.median(durations), 3),
+            # Jitter als Standardabweichung der Lesedauer
+            "jitter": round(statistics.pstdev(durations), 3),
+        }
+    return result
+
+
+def run_self_test(chip_path: str, samples: int = DEFAULT_SAMPLES) -> dict:
+    """
+    Führt die blockierenden Teile des Self-Tests aus (GPIO-Chip neu öffnen,
+    I2C-Burst). Muss im Executor laufen.
+    """
+    _LOGGER.debug("Running X728 self-test with %d samples", samples)
+    return {
+        "gpio": _gpio_self_test(chip_path),
+        "i2c": _i2c_self_test(samples),
+    }
+
+
+def _entity_states(hass: HomeAssistant, entry: ConfigEntry) -> dict:
+    """
+    Aktueller Zustand aller Entitäten der Integration. Es gibt keinen Coordinator
+    oder Cache: jede Entität hält ihren zuletzt gelesenen Wert selbst.
+    """
+    states = {}
+    registry = er.async_get(hass)
+    for reg_entry in er.async_entries_for_config_entry(registry, entry.entry_id):
+        state = hass.states.get(reg_entry.entity_id)
+        states[reg_entry.entity_id] = {
+            "unique_id": reg_entry.unique_id,
+            "state": state.state if state else None,
+            "last_updated": state.last_updated.isoformat() if state else None,
+        }
+    return states
+
+
+async def async_run_self_test(hass: HomeAssistant, entry: ConfigEntry, samples: int = DEFAULT_SAMPLES) -> dict:
+    """Self-Test für einen Config-Entry inkl. Entitätszustände."""
+    hub = hass.data[DOMAIN][entry.entry_id]["hub"]
+
+    # Leitungsstatus im Event-Loop abfragen: der Chip des Hubs wird auch von
+    # add_sensor/add_switch hier genutzt und ist nicht thread-sicher.
+    lines = {
+        name: {"pin": pin, **hub.line_status(pin)}
+        for name, pin in PINS.items()
+    }
+
+    result = await hass.async_add_executor_job(run_self_test, hub.chip_path, samples)
+    result["gpio"].update({
+        "chip_path": hub.chip_path,
+        "online": hub.online,
+        # Werte vom Öffnen des Chips beim Start der Integration
+        "init_open_ms": hub.chip_open_ms,
+        "init_error": hub.chip_error,
+        "lines": lines,
+    })
+    result["entities"] = _entity_states(hass, entry)
+    return result
+
+
+async def async_get_config_entry_diagnostics(hass: HomeAssistant, entry: ConfigEntry) -> dict:
+    """Wird von Home Assistant für den Diagnose-Download aufgerufen."""
+    return {
+        "entry": {
+            "entry_id": entry.entry_id,
+            "options": dict(entry.options),
+        },
+        **await async_run_self_test(hass, entry),
+    }
@@ -1,4 +1,5 @@
 import logging
+import time
 import gpiod
 from datetime import timedelta
 from gpiod.line import Direction, Value, Bias, Drive, Edge, Clock
@@ -15,6 +16,10 @@ class X728Hub:
         CHIP_PATH = "/dev/gpiochip0" 
         _LOGGER.debug("X728Hub init: opening %s", CHIP_PATH)
         
+        # Für die Diagnose: Dauer und ggf. Fehler beim Öffnen des Chips merken
+        self.chip_path = CHIP_PATH
+        self.chip_error = None
+        start = time.perf_counter()
         try:
             self._chip = gpiod.Chip(CHIP_PATH)
             self._online = True
@@ -22,6 +27,8 @@ class X728Hub:
             _LOGGER.error("Failed to open GPIO chip at %s. Error: %s. Check host configuration.", CHIP_PATH, e)
             self._chip = None
             self._online = False
+            self.chip_error = str(e)
+        self.chip_open_ms = round((time.perf_counter() - start) * 1000, 3)
 
     @property
     def online(self):
@@ -67,6 +74,23 @@ class X728Hub:
         )
         return line_request
 
+    def line_status(self, port):
+        """Liefert den Belegungsstatus einer GPIO-Leitung (für Diagnose/Self-Test)."""
+        if not self._online:
+            return {"error": "hub offline"}
+
+        try:
+            info = self._chip.get_line_info(port)
+        except Exception as e:
+            return {"error": str(e)}
+
+        return {
+            "used": info.used,
+            "consumer": info.consumer,
+            "direction": info.direction.name,
+            "active_low": info.active_low,
+        }
+
     def turn_on(self, line_req, port):
         """Setzt die GPIO-Leitung auf ACTIVE (z.B. High für den Shutdown-Puls)."""
         line_req.set_value(port, Value.ACTIVE)